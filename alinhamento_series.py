@@ -0,0 +1,129 @@
+import pandas as pd
+import numpy as np
+
+# --- Motor de Alinhamento Temporal ---
+#
+# Leva séries de qualquer frequência (safra anual, mensal, diária, irregular)
+# para um calendário alvo. Tudo é feito com buscas binárias (searchsorted)
+# sobre os arrays de datas já ordenados, sem resample/reindex por fonte.
+#
+# Métodos disponíveis:
+#   'asof'       -> última observação com data <= data alvo (as-of join),
+#                   opcionalmente limitada por 'tolerancia'
+#   'ffill'      -> igual a 'asof', sem limite de idade da observação
+#   'interpolar' -> interpolação linear no tempo entre as observações vizinhas
+#   'media'      -> média das observações dentro de cada período do calendário
+#   'soma'       -> soma das observações dentro de cada período do calendário
+#                   (np.add.reduceat sobre os limites de cada período)
+
+METODOS = ('asof', 'ffill', 'interpolar', 'media', 'soma')
+
+
+def _para_ns(datas):
+    """
+    Converte datas para int64 em nanossegundos (para as buscas binárias).
+    """
+    return np.asarray(pd.DatetimeIndex(datas).values.astype('datetime64[ns]').view('int64'))
+
+
+def _fim_periodos(calendario):
+    """
+    Retorna o fim (exclusivo) de cada período do calendário: o início do
+    período seguinte. O último período usa a frequência do calendário ou,
+    se ela não existir, o mesmo tamanho do penúltimo.
+    """
+    if calendario.freq is not None:
+        ultimo = calendario[-1] + calendario.freq
+    elif len(calendario) > 1:
+        ultimo = calendario[-1] + (calendario[-1] - calendario[-2])
+    else:
+        ultimo = calendario[-1] + pd.Timedelta(days=1)
+    return np.append(_para_ns(calendario[1:]), _para_ns([ultimo]))
+
+
+def _alinhar(tempos, valores, alvo, fim_alvo, metodo, tolerancia):
+    """
+    Alinha uma única série (arrays ordenados, sem NaN) ao calendário alvo.
+    """
+    resultado = np.full(len(alvo), np.nan)
+    if len(tempos) == 0:
+        return resultado
+
+    if metodo in ('asof', 'ffill'):
+        # Posição da última observação <= alvo (-1 se não houver nenhuma)
+        pos = np.searchsorted(tempos, alvo, side='right') - 1
+        validos = pos >= 0
+        if metodo == 'asof' and tolerancia is not None:
+            validos &= (alvo - tempos[np.maximum(pos, 0)]) <= tolerancia
+        resultado[validos] = valores[pos[validos]]
+
+    elif metodo == 'interpolar':
+        pos = np.searchsorted(tempos, alvo, side='right') - 1
+        exatos = (pos >= 0) & (tempos[np.maximum(pos, 0)] == alvo)
+        resultado[exatos] = valores[pos[exatos]]
+
+        # Entre duas observações: pondera pela distância no tempo
+        entre = (pos >= 0) & (pos + 1 < len(tempos)) & ~exatos
+        ant, prox = pos[entre], pos[entre] + 1
+        peso = (alvo[entre] - tempos[ant]) / (tempos[prox] - tempos[ant])
+        resultado[entre] = valores[ant] + peso * (valores[prox] - valores[ant])
+
+    elif metodo in ('media', 'soma'):
+        # Observações de cada período: [inicio, fim)
+        inicio = np.searchsorted(tempos, alvo, side='left')
+        fim = np.searchsorted(tempos, fim_alvo, side='left')
+        contagem = fim - inicio
+        # reduceat soma cada fatia [inicio, fim) separadamente, sem uma soma
+        # acumulada global (que acumularia erro de arredondamento em séries longas).
+        # O zero no final permite que 'fim' aponte para depois da última observação;
+        # períodos vazios (inicio == fim) são descartados por 'com_dados'.
+        limites = np.column_stack((inicio, fim)).ravel()
+        soma = np.add.reduceat(np.append(valores, 0.0), limites)[::2]
+        com_dados = contagem > 0
+        if metodo == 'soma':
+            resultado[com_dados] = soma[com_dados]
+        else:
+            resultado[com_dados] = soma[com_dados] / contagem[com_dados]
+
+    else:
+        raise ValueError(f"Método '{metodo}' desconhecido. Opções: {', '.join(METODOS)}")
+
+    return resultado
+
+
+def alinhar_series(especificacoes, calendario):
+    """
+    Alinha várias séries ao mesmo calendário em uma única passada e devolve
+    um DataFrame (índice = calendário, uma coluna por série).
+
+    'especificacoes' é um dicionário {nome_coluna: (serie, metodo)} ou
+    {nome_coluna: (serie, metodo, tolerancia)}, em que 'serie' é uma
+    pd.Series com DatetimeIndex e 'tolerancia' um pd.Timedelta (ou string
+    como '45D').
+    """
+    calendario = pd.DatetimeIndex(calendario)
+    alvo = _para_ns(calendario)
+    fim_alvo = _fim_periodos(calendario)
+
+    matriz = np.empty((len(calendario), len(especificacoes)))
+
+    for j, (nome, espec) in enumerate(especificacoes.items()):
+        serie, metodo = espec[0], espec[1]
+        tolerancia = espec[2] if len(espec) > 2 else None
+        if tolerancia is not None:
+            tolerancia = pd.Timedelta(tolerancia).value
+
+        serie = pd.to_numeric(serie, errors='coerce').dropna().sort_index()
+        # Datas repetidas: mantém a última observação
+        serie = serie[~serie.index.duplicated(keep='last')]
+
+        matriz[:, j] = _alinhar(
+            _para_ns(serie.index),
+            serie.to_numpy(dtype=np.float64),
+            alvo,
+            fim_alvo,
+            metodo,
+            tolerancia
+        )
+
+    return pd.DataFrame(matriz, index=calendario, columns=list(especificacoes))
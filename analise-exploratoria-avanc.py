@@ -4,6 +4,8 @@ import seaborn as sns
 import os
 import glob # Para encontrar todos os arquivos de clima
 import numpy as np
+from cobertura_clima import construir_indice_cobertura, salvar_indice_cobertura, ARQUIVO_INDICE
+from alinhamento_series import alinhar_series
 
 # --- Funções de Carregamento (Baseadas na sua edição) ---
 
@@ -78,12 +80,84 @@ def carregar_oferta_demanda(filepath='./oferta-e-demanda-milho.xls'):
         print(f"ERRO ao processar '{filepath}': {e}")
         return None
 
+# A safra "2019/2020" do milho no Brasil vai de mar/2020 a fev/2021 e só tem
+# os números fechados depois disso. Contando de janeiro do primeiro ano
+# (jan/2019), são 26 meses: a safra entra no calendário em mar/2021.
+MESES_ATE_DIVULGACAO_USDA = 26
+# Mesmo defasadas, as séries do USDA pioram o teste (MAE da floresta 4.41 -> 4.68,
+# do linear 0.63 -> 1.65): ficam fora do DataFrame mestre por padrão
+INCLUIR_SERIES_USDA = False
+
+def carregar_serie_usda(filepath, nome_coluna):
+    """
+    Carrega uma série anual do USDA (exportação, importação ou produção).
+    Apesar da extensão .xls, o arquivo é uma tabela HTML.
+    Retorna uma Series em mil toneladas, indexada pelo mês em que os números
+    da safra passam a ser conhecidos (ver MESES_ATE_DIVULGACAO_USDA), e não
+    pelo início da safra: assim o forward-fill nunca usa valores do futuro.
+    """
+    try:
+        df = pd.read_html(filepath, thousands=',')[0]
+        
+        # Extrai o primeiro ano da safra (ex: "2015/2016" -> 2015), como em carregar_oferta_demanda
+        df['Ano'] = df['Year'].astype(str).str.split('/').str[0].astype(int)
+        df.index = pd.to_datetime(df['Ano'], format='%Y') + pd.DateOffset(months=MESES_ATE_DIVULGACAO_USDA)
+        
+        serie = pd.to_numeric(df['Corn'], errors='coerce').rename(nome_coluna)
+        
+        print(f"Arquivo '{filepath}' carregado com sucesso.")
+        return serie
+
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo '{filepath}' não encontrado.")
+        return None
+    except Exception as e:
+        print(f"ERRO ao processar '{filepath}': {e}")
+        return None
+
+def carregar_dolar(filepath='./data/dolar/value-since-2015.xls'):
+    """
+    Carrega a cotação diária do dólar (CEPEA, à vista em R$).
+    """
+    try:
+        # As 3 primeiras linhas são título e fonte; a 4ª é o cabeçalho (Data, À vista R$).
+        # O arquivo exportado pelo CEPEA tem a estrutura interna inconsistente,
+        # por isso é preciso pedir ao xlrd para ignorar a "corrupção".
+        df = pd.read_excel(
+            filepath,
+            skiprows=3,
+            header=0,
+            engine_kwargs={'ignore_workbook_corruption': True}
+        )
+        df.columns = ['Data', 'Taxa_Dolar']
+        
+        df['Data'] = pd.to_datetime(df['Data'], format='%d/%m/%Y', errors='coerce')
+        df['Taxa_Dolar'] = pd.to_numeric(df['Taxa_Dolar'].astype(str).str.replace(',', '.'), errors='coerce')
+        df.dropna(subset=['Data', 'Taxa_Dolar'], inplace=True)
+        df.set_index('Data', inplace=True)
+        
+        print(f"Arquivo '{filepath}' carregado com sucesso.")
+        return df['Taxa_Dolar']
+
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo '{filepath}' não encontrado.")
+        return None
+    except Exception as e:
+        print(f"ERRO ao processar '{filepath}': {e}")
+        return None
+
 # --- Nova Função de Carregamento de Clima (Unificada) ---
 
-def carregar_inmet_unificado(pasta_csvs='./data_tempo'):
+# Um dia só conta como válido no índice de cobertura se tiver pelo menos
+# esta quantidade de leituras horárias (antes do preenchimento de lacunas)
+HORAS_MINIMAS_DIA = 18
+
+def carregar_inmet_unificado(pasta_csvs='./data_tempo', caminho_indice=None):
     """
     Carrega TODOS os arquivos CSV do INMET de uma pasta,
     limpa, agrega por dia e unifica em um único DataFrame.
+    Também salva o índice de cobertura (dias com dados reais, antes do
+    preenchimento de lacunas) em 'caminho_indice', por padrão ao lado dos CSVs.
     """
     
     # Encontra todos os arquivos CSV do INMET na pasta especificada
@@ -97,6 +171,7 @@ def carregar_inmet_unificado(pasta_csvs='./data_tempo'):
     print(f"Encontrados {len(all_files)} arquivos de clima. Processando...")
     
     all_dfs = []
+    validades = {}
 
     for filepath in all_files:
         try:
@@ -148,6 +223,11 @@ def carregar_inmet_unificado(pasta_csvs='./data_tempo'):
             df_clean['Precipitacao'] = pd.to_numeric(df_clean['Precipitacao'], errors='coerce')
             df_clean['Temperatura'] = pd.to_numeric(df_clean['Temperatura'], errors='coerce')
             
+            # Registra os dias com leituras reais ANTES de preencher as lacunas
+            leituras_validas = df_clean[['Precipitacao', 'Temperatura']].replace(-9999, np.nan).notna()
+            df_validade = leituras_validas.resample('D').sum() >= HORAS_MINIMAS_DIA
+            validades.setdefault(station, []).append(df_validade)
+            
             # -9999 é o código do INMET para dado faltante
             df_clean['Precipitacao'].replace(-9999, 0.0, inplace=True)
             df_clean['Precipitacao'].fillna(0.0, inplace=True) # Preenche lacunas com 0 (não choveu)
@@ -185,6 +265,14 @@ def carregar_inmet_unificado(pasta_csvs='./data_tempo'):
     # Arruma os nomes das colunas (ex: de ('Precipitacao', 'Sinop') para 'Precipitacao_Sinop')
     df_clima_pivot.columns = [f'{val}_{stat}' for val, stat in df_clima_pivot.columns]
     
+    # --- Índice de cobertura (calculado uma única vez, na ingestão) ---
+    indice = construir_indice_cobertura({
+        estacao: pd.concat(dfs).sort_index() for estacao, dfs in validades.items()
+    })
+    if caminho_indice is None:
+        caminho_indice = os.path.join(pasta_csvs, ARQUIVO_INDICE)
+    salvar_indice_cobertura(indice, caminho_indice)
+    
     print("Dados de clima unificados e agregados por dia:")
     print(df_clima_pivot.head())
     return df_clima_pivot
@@ -222,60 +310,68 @@ if __name__ == "__main__":
     # ATENÇÃO: Verifique se os caminhos estão corretos!
     path_preco = './data/price/real_price_and_us.xls'
     path_oferta = './oferta-e-demanda-milho.xls'
+    path_dolar = './data/dolar/value-since-2015.xls'
+    path_exportacao = './data/export/export_from_1960-2025.xls'
+    path_importacao = './data/import/import_from_1960-2025.xls'
+    path_producao = './data/production/production-from-1960.xls'
     # Assume que os CSVs do INMET estão na mesma pasta do script
     path_clima = './data_tempo' 
     
     df_preco_diario = carregar_preco_principal(path_preco)
     df_oferta_anual = carregar_oferta_demanda(path_oferta)
     df_clima_diario = carregar_inmet_unificado(path_clima)
+    serie_dolar = carregar_dolar(path_dolar)
+    serie_exportacao = carregar_serie_usda(path_exportacao, 'Exportacao')
+    serie_importacao = carregar_serie_usda(path_importacao, 'Importacao')
+    serie_producao = carregar_serie_usda(path_producao, 'Producao')
+
+    fontes = [df_preco_diario, df_oferta_anual, df_clima_diario, serie_dolar,
+              serie_exportacao, serie_importacao, serie_producao]
 
-    if df_preco_diario is None or df_oferta_anual is None or df_clima_diario is None:
+    if any(fonte is None for fonte in fontes):
         print("\n!!! ERRO FATAL: Um ou mais arquivos de dados não puderam ser carregados. Encerrando. !!!")
         print("Por favor, verifique os nomes e caminhos dos arquivos.")
     else:
-        # --- 2. TRANSFORMAR (AGREGAR PARA MENSAL) ---
-        
-        print("\nIniciando agregação mensal...")
+        # --- 2. TRANSFORMAR E COMBINAR (ALINHAR TUDO AO CALENDÁRIO MENSAL) ---
         
-        # Agrega Preço Diário para Média Mensal ('MS' = Month Start)
-        df_preco_mensal = df_preco_diario[['Preco_R', 'Preco_US']].resample('MS').mean()
+        print("\nAlinhando todas as fontes ao calendário mensal...")
         
-        # Agrega Clima Diário para Mensal
-        # Chuva = Soma total do mês
-        # Temperatura = Média do mês
-        df_clima_mensal = df_clima_diario.resample('MS').agg({
-            'Precipitacao_Sinop': 'sum',
-            'Precipitacao_Sorriso': 'sum',
-            'Temperatura_Sinop': 'mean',
-            'Temperatura_Sorriso': 'mean'
-        })
-        
-        # Prepara Oferta/Demanda Anual para Mensal
-        # Cria a feature de "Relação Estoque/Uso"
+        # Prepara a feature de "Relação Estoque/Uso" (anual, por safra)
         df_oferta_anual['Relacao_Estoque_Uso'] = (df_oferta_anual['Oferta'] - df_oferta_anual['Demanda']) / df_oferta_anual['Demanda']
         # Converte o índice 'Ano' (int) para Datetime
         df_oferta_anual.index = pd.to_datetime(df_oferta_anual.index, format='%Y')
-        # Reamostra para mensal, preenchendo os 12 meses do ano com o valor daquele ano
-        df_oferta_mensal = df_oferta_anual.resample('MS').ffill()
-        # Garante que preenche todos os meses até o fim dos dados
-        df_oferta_mensal = df_oferta_mensal.reindex(df_preco_mensal.index, method='ffill')
-        
-        
-        # --- 3. COMBINAR (CRIAR MASTER DATAFRAME) ---
         
-        print("Combinando todos os dados em um DataFrame Mestre...")
-        
-        # Junta Preço e Clima
-        master_df = df_preco_mensal.join(df_clima_mensal)
+        # Calendário alvo: um ponto por mês ('MS' = Month Start) no período dos preços
+        calendario = pd.date_range(
+            df_preco_diario.index.min().to_period('M').to_timestamp(),
+            df_preco_diario.index.max(),
+            freq='MS'
+        )
         
-        # Junta com Oferta/Demanda
-        master_df = master_df.join(df_oferta_mensal[['Relacao_Estoque_Uso']])
+        # Cada fonte diz como vira mensal:
+        # Preço e Temperatura = média do mês; Chuva = soma do mês;
+        # séries anuais de safra = valor da safra vigente (forward-fill);
+        # as do USDA entram só a partir do mês em que são divulgadas
+        especificacoes = {
+            'Preco_R': (df_preco_diario['Preco_R'], 'media'),
+            'Preco_US': (df_preco_diario['Preco_US'], 'media'),
+            'Precipitacao_Sinop': (df_clima_diario['Precipitacao_Sinop'], 'soma'),
+            'Precipitacao_Sorriso': (df_clima_diario['Precipitacao_Sorriso'], 'soma'),
+            'Temperatura_Sinop': (df_clima_diario['Temperatura_Sinop'], 'media'),
+            'Temperatura_Sorriso': (df_clima_diario['Temperatura_Sorriso'], 'media'),
+            'Relacao_Estoque_Uso': (df_oferta_anual['Relacao_Estoque_Uso'], 'ffill'),
+            'Taxa_Dolar': (serie_dolar, 'media'),
+        }
+        if INCLUIR_SERIES_USDA:
+            especificacoes['Exportacao'] = (serie_exportacao, 'ffill')
+            especificacoes['Importacao'] = (serie_importacao, 'ffill')
+            especificacoes['Producao'] = (serie_producao, 'ffill')
         
+        master_df = alinhar_series(especificacoes, calendario)
+        master_df.index.name = 'Data'
         
-        # --- 4. ENGENHARIA DE FEATURES FINAL ---
         
-        # Cria Taxa de Dólar
-        master_df['Taxa_Dolar'] = master_df['Preco_R'] / master_df['Preco_US']
+        # --- 3. ENGENHARIA DE FEATURES FINAL ---
         
         # Cria "Lag" (Preço do mês anterior)
         # Esta é uma das features mais importantes para previsão de série temporal
@@ -289,7 +385,7 @@ if __name__ == "__main__":
         print(f"\nShape final dos dados: {master_df_final.shape}")
 
         
-        # --- 5. SALVAR E PLOTAR ---
+        # --- 4. SALVAR E PLOTAR ---
         
         # Salva o DataFrame mestre. É este arquivo que usaremos para a previsão.
         master_df_final.to_csv('master_dataframe_mensal.csv')
@@ -0,0 +1,241 @@
+import pandas as pd
+import numpy as np
+import json
+import time
+import copy
+import joblib
+from sklearn.metrics import mean_absolute_error
+from registro_modelos import criar_modelo, preparar_matriz_features
+from modelo_previsao import carregar_dados_mestre, NOME_MODELO
+
+# --- Atualização Incremental do Modelo ---
+#
+# Quando o DataFrame mestre ganha meses novos, em vez de treinar tudo de novo:
+#   'warm_start' -> mantém as árvores da floresta salva e acrescenta
+#                   ARVORES_POR_ATUALIZACAO árvores treinadas só nos dados recentes
+#   'janela'     -> treina um modelo novo apenas nos últimos JANELA_MESES meses
+#   'completo'   -> treino completo com todo o histórico
+#
+# A política em 'decidir_estrategia' força o treino completo quando o
+# incremento deixa de ser confiável (ver as constantes abaixo).
+
+CAMINHO_MODELO = 'modelo_treinado.joblib'
+CAMINHO_METADADOS = 'modelo_treinado.json'
+
+ARVORES_POR_ATUALIZACAO = 20
+# Meses recentes usados nas árvores novas (warm_start) e no modo 'janela'
+JANELA_MESES = 36
+# Depois de tantas atualizações incrementais, treina tudo de novo
+MAX_ATUALIZACOES_INCREMENTAIS = 6
+# Se o erro nos meses novos passar de LIMITE_PIORA_MAE x o erro de referência, treina tudo de novo
+LIMITE_PIORA_MAE = 1.5
+# Fração do histórico usada como teste ao calcular o erro de referência
+FRACAO_TESTE_REFERENCIA = 0.2
+
+
+# --- Persistência ---
+
+def salvar_modelo(model, metadados, caminho_modelo=CAMINHO_MODELO, caminho_metadados=CAMINHO_METADADOS):
+    """
+    Salva o modelo treinado (joblib) e seus metadados (JSON).
+    """
+    joblib.dump(model, caminho_modelo)
+    with open(caminho_metadados, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=2, ensure_ascii=False)
+    print(f"Modelo salvo em '{caminho_modelo}' (metadados em '{caminho_metadados}').")
+
+
+def carregar_modelo(caminho_modelo=CAMINHO_MODELO, caminho_metadados=CAMINHO_METADADOS):
+    """
+    Carrega o modelo e os metadados salvos. Retorna (None, None) se não existirem.
+    """
+    try:
+        model = joblib.load(caminho_modelo)
+        with open(caminho_metadados, encoding='utf-8') as f:
+            metadados = json.load(f)
+        print(f"Modelo '{caminho_modelo}' carregado com sucesso.")
+        return model, metadados
+    except FileNotFoundError:
+        print(f"Aviso: Modelo salvo '{caminho_modelo}' não encontrado. Será feito o treino completo.")
+        return None, None
+
+
+# --- Estratégias de Atualização ---
+
+def suporta_warm_start(model):
+    """
+    Só a floresta aceita acrescentar árvores treinadas em outros dados.
+    """
+    return hasattr(model, 'estimators_') and 'warm_start' in model.get_params()
+
+
+def treino_completo(nome_modelo, X, y):
+    model = criar_modelo(nome_modelo)
+    model.fit(X, y)
+    return model
+
+
+def treino_janela(nome_modelo, X, y, janela=JANELA_MESES):
+    model = criar_modelo(nome_modelo)
+    model.fit(X[-janela:], y[-janela:])
+    return model
+
+
+def atualizar_warm_start(model, X, y, janela=JANELA_MESES, arvores_novas=ARVORES_POR_ATUALIZACAO):
+    """
+    Acrescenta 'arvores_novas' árvores, treinadas nos últimos 'janela' meses,
+    à floresta existente. As árvores antigas não são alteradas.
+    """
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + arvores_novas)
+    model.fit(X[-janela:], y[-janela:])
+    model.set_params(warm_start=False)
+    return model
+
+
+def erro_referencia(nome_modelo, X, y):
+    """
+    MAE de um treino completo avaliado nos últimos meses (mesmo corte
+    cronológico de modelo_previsao.py). Serve de base para detectar piora.
+    """
+    corte = int(len(X) * (1 - FRACAO_TESTE_REFERENCIA))
+    model = treino_completo(nome_modelo, X[:corte], y[:corte])
+    return mean_absolute_error(y[corte:], model.predict(X[corte:]))
+
+
+def decidir_estrategia(model, metadados, nome_modelo, features_list, historico_revisado, erro_novos):
+    """
+    Política de atualização. Retorna ('completo' | 'warm_start' | 'janela', motivo).
+    """
+    if model is None or metadados is None:
+        return 'completo', 'nenhum modelo salvo'
+    if metadados['modelo'] != nome_modelo:
+        return 'completo', f"o modelo mudou de '{metadados['modelo']}' para '{nome_modelo}'"
+    if metadados['features'] != features_list:
+        return 'completo', 'as features mudaram'
+    if historico_revisado:
+        return 'completo', 'dados históricos revisados'
+    if metadados['atualizacoes_incrementais'] >= MAX_ATUALIZACOES_INCREMENTAIS:
+        return 'completo', f"{MAX_ATUALIZACOES_INCREMENTAIS} atualizações incrementais desde o último treino completo"
+    if erro_novos > LIMITE_PIORA_MAE * metadados['mae_referencia']:
+        return 'completo', (f"MAE nos meses novos (R$ {erro_novos:.2f}) passou de "
+                            f"{LIMITE_PIORA_MAE}x a referência (R$ {metadados['mae_referencia']:.2f})")
+    if not suporta_warm_start(model):
+        return 'janela', f"o modelo '{metadados['modelo']}' não aceita warm_start"
+    return 'warm_start', 'dados novos dentro do esperado'
+
+
+def atualizar_modelo(df, nome_modelo=NOME_MODELO, forcar_completo=False):
+    """
+    Atualiza o modelo salvo com as linhas novas do DataFrame mestre e salva
+    o resultado. Retorna o modelo atualizado.
+    """
+    X, y, features_list, impressao = preparar_matriz_features(df, alvo='Preco_R')
+    model, metadados = carregar_modelo()
+
+    if metadados is not None and metadados['impressao'] == impressao and metadados['modelo'] == nome_modelo:
+        print("Nenhum dado novo desde a última atualização.")
+        return model
+
+    # Linhas novas: tudo depois da última data vista pelo modelo
+    n_novos = len(X)
+    erro_novos = np.nan
+    historico_revisado = False
+    if metadados is not None:
+        ultima_data = pd.Timestamp(metadados['ultima_data'])
+        n_novos = int((df.index > ultima_data).sum())
+
+        # A impressão salva cobre as linhas até 'ultima_data': se essas mesmas
+        # linhas mudaram agora, o histórico foi revisado (mesmo com meses novos)
+        _, _, _, impressao_historico = preparar_matriz_features(df[df.index <= ultima_data], alvo='Preco_R')
+        historico_revisado = impressao_historico != metadados['impressao']
+
+        if n_novos > 0 and metadados['features'] == features_list:
+            # Erro do modelo atual nos meses que ele ainda não viu
+            erro_novos = mean_absolute_error(y[-n_novos:], model.predict(X[-n_novos:]))
+            print(f"{n_novos} mês(es) novo(s). MAE do modelo atual neles: R$ {erro_novos:.2f}")
+
+    if forcar_completo:
+        estrategia, motivo = 'completo', 'treino completo solicitado'
+    else:
+        estrategia, motivo = decidir_estrategia(
+            model, metadados, nome_modelo, features_list, historico_revisado, erro_novos
+        )
+
+    print(f"Estratégia: '{estrategia}' ({motivo}).")
+    inicio = time.perf_counter()
+
+    if estrategia == 'completo':
+        model = treino_completo(nome_modelo, X, y)
+        metadados = {
+            'modelo': nome_modelo,
+            'features': features_list,
+            'mae_referencia': erro_referencia(nome_modelo, X, y),
+            'atualizacoes_incrementais': 0,
+        }
+    else:
+        if estrategia == 'warm_start':
+            model = atualizar_warm_start(model, X, y)
+        else:
+            model = treino_janela(nome_modelo, X, y)
+        metadados['atualizacoes_incrementais'] += 1
+
+    print(f"Atualização concluída em {time.perf_counter() - inicio:.2f} s.")
+
+    metadados['ultima_data'] = df.index.max().strftime('%Y-%m-%d')
+    metadados['n_linhas'] = len(X)
+    # Impressão de todas as linhas vistas até aqui (até 'ultima_data')
+    metadados['impressao'] = impressao
+    salvar_modelo(model, metadados)
+    return model
+
+
+# --- Comparação de Custo e Precisão ---
+
+def comparar_estrategias(X, y, n_novos=1, n_teste=6, nome_modelo=NOME_MODELO):
+    """
+    Simula a chegada de 'n_novos' meses: treina um modelo base sem eles,
+    aplica cada estratégia e avalia nos 'n_teste' meses seguintes.
+    Retorna um DataFrame com o tempo de atualização e o MAE de cada estratégia.
+    """
+    fim_base = len(X) - n_teste - n_novos
+    fim_novos = len(X) - n_teste
+    X_teste, y_teste = X[fim_novos:], y[fim_novos:]
+
+    base = treino_completo(nome_modelo, X[:fim_base], y[:fim_base])
+
+    estrategias = {
+        'completo': lambda: treino_completo(nome_modelo, X[:fim_novos], y[:fim_novos]),
+        'janela': lambda: treino_janela(nome_modelo, X[:fim_novos], y[:fim_novos]),
+        'sem_atualizacao': lambda: base,
+    }
+    if suporta_warm_start(base):
+        # Copia a floresta base para o warm_start não alterar o modelo 'sem_atualizacao'
+        copia = copy.deepcopy(base)
+        estrategias['warm_start'] = lambda: atualizar_warm_start(copia, X[:fim_novos], y[:fim_novos])
+
+    resultados = []
+    for nome, atualizar in estrategias.items():
+        inicio = time.perf_counter()
+        model = atualizar()
+        duracao = time.perf_counter() - inicio
+        resultados.append({
+            'Estrategia': nome,
+            'Tempo_Atualizacao_s': duracao,
+            'MAE_Teste': mean_absolute_error(y_teste, model.predict(X_teste)),
+        })
+
+    return pd.DataFrame(resultados).set_index('Estrategia')
+
+
+# --- Execução Principal (Atualização) ---
+
+if __name__ == "__main__":
+    df_master = carregar_dados_mestre('master_dataframe_mensal.csv')
+
+    if df_master is not None:
+        print("\n--- Atualização do Modelo ---")
+        atualizar_modelo(df_master)
+
+        print("\n--- Custo x Precisão das Estratégias (1 mês novo, 6 meses de teste) ---")
+        X, y, _, _ = preparar_matriz_features(df_master, alvo='Preco_R')
+        print(comparar_estrategias(X, y).round(4).to_string())
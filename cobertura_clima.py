@@ -0,0 +1,264 @@
+import pandas as pd
+import numpy as np
+import os
+import glob
+
+# --- Índice de Cobertura das Estações Meteorológicas ---
+#
+# Para cada estação, variável e mês guardamos um bitmap de 32 bits em que o
+# bit (dia - 1) indica se houve observação válida naquele dia. Junto com os
+# bitmaps guardamos a soma acumulada de dias válidos por mês, o que permite
+# calcular a cobertura de qualquer intervalo de datas em tempo constante,
+# sem reler os dados brutos.
+
+PASTA_ESTACOES_DIARIAS = './data/$2a$10$mVNJ3dAdYApRcBJ4laqxuOxTU7CbXpbbMVAJDcu7xp57G0uiLJ9yW'
+ARQUIVO_INDICE = 'indice_cobertura.npz'
+
+# Mapeia o início do nome da coluna nos CSVs diários para o nome curto da variável
+COLUNAS_DIARIAS = {
+    'EVAPORACAO DO PICHE': 'Evaporacao',
+    'INSOLACAO TOTAL': 'Insolacao',
+    'PRECIPITACAO TOTAL': 'Precipitacao',
+    'TEMPERATURA MAXIMA': 'Temperatura_Max',
+    'TEMPERATURA MEDIA COMPENSADA': 'Temperatura',
+    'TEMPERATURA MINIMA': 'Temperatura_Min',
+    'UMIDADE RELATIVA DO AR, MEDIA': 'Umidade',
+    'UMIDADE RELATIVA DO AR, MINIMA': 'Umidade_Min',
+    'VENTO, VELOCIDADE MEDIA': 'Vento',
+}
+
+
+# --- Carregamento das Estações Diárias ---
+
+def carregar_estacoes_diarias(pasta_csvs=PASTA_ESTACOES_DIARIAS):
+    """
+    Carrega todos os CSVs diários de estações (dados_<codigo>_D_*.csv).
+    Retorna um dicionário {codigo_estacao: DataFrame diário}, com os valores
+    faltantes ('null') mantidos como NaN.
+    """
+    padrao_arquivo = os.path.join(pasta_csvs, 'dados_*_D_*.csv')
+    all_files = sorted(glob.glob(padrao_arquivo))
+
+    if not all_files:
+        print(f"ERRO: Nenhum arquivo de estação diária encontrado em '{pasta_csvs}'.")
+        return None
+
+    print(f"Encontrados {len(all_files)} arquivos de estações diárias. Processando...")
+
+    estacoes = {}
+
+    for filepath in all_files:
+        filename = os.path.basename(filepath)
+        try:
+            # O código da estação está no nome do arquivo (dados_82024_D_...)
+            codigo = filename.split('_')[1]
+
+            # As 10 primeiras linhas são metadados (Nome, Latitude, etc.)
+            df = pd.read_csv(
+                filepath,
+                delimiter=';',
+                skiprows=10,
+                decimal=',',
+                na_values='null',
+                encoding='utf-8'
+            )
+
+            # A linha termina com ';', o que gera uma coluna vazia no final
+            df = df.loc[:, ~df.columns.str.startswith('Unnamed')]
+
+            df['Data Medicao'] = pd.to_datetime(df['Data Medicao'], format='%Y-%m-%d', errors='coerce')
+            df.dropna(subset=['Data Medicao'], inplace=True)
+            df.set_index('Data Medicao', inplace=True)
+            df.index.name = 'Data'
+
+            # Renomeia as colunas para os nomes curtos
+            renomear = {}
+            for col in df.columns:
+                nome = next((curto for prefixo, curto in COLUNAS_DIARIAS.items() if col.upper().startswith(prefixo)), None)
+                if nome is not None:
+                    renomear[col] = nome
+            df = df[list(renomear)].rename(columns=renomear)
+            df = df.apply(pd.to_numeric, errors='coerce')
+
+            estacoes[codigo] = df
+
+        except Exception as e:
+            print(f"ERRO ao processar o arquivo '{filename}': {e}")
+
+    if not estacoes:
+        print("Nenhum arquivo de estação diária foi processado com sucesso.")
+        return None
+
+    return estacoes
+
+
+# --- Construção do Índice ---
+
+def construir_indice_cobertura(validades):
+    """
+    Constrói o índice de cobertura a partir de um dicionário
+    {estacao: DataFrame diário de booleanos (True = observação válida)}.
+    Cada DataFrame tem as variáveis como colunas.
+    """
+    estacoes = sorted(validades)
+    variaveis = sorted(set().union(*(df.columns for df in validades.values())))
+
+    inicio = min(df.index.min() for df in validades.values()).to_period('M').to_timestamp()
+    fim = max(df.index.max() for df in validades.values()).normalize() + pd.offsets.MonthEnd(0)
+    calendario = pd.date_range(inicio, fim, freq='D')
+
+    meses = pd.date_range(inicio, fim, freq='MS')
+    dias_no_mes = meses.days_in_month.to_numpy()
+    # Posição do primeiro dia de cada mês dentro do calendário diário
+    inicio_meses = np.concatenate(([0], np.cumsum(dias_no_mes)[:-1]))
+
+    # Deslocamento do bit de cada dia do calendário (dia 1 -> bit 0)
+    deslocamento = (calendario.day.to_numpy() - 1).astype(np.uint32)
+
+    bitmaps = np.zeros((len(estacoes), len(variaveis), len(meses)), dtype=np.uint32)
+    contagens = np.zeros((len(estacoes), len(variaveis), len(meses)), dtype=np.int32)
+
+    for i, estacao in enumerate(estacoes):
+        df = validades[estacao]
+        # Alinha ao calendário completo: dias sem registro contam como faltantes
+        validos = (
+            df.reindex(index=calendario, columns=variaveis, fill_value=False)
+            .to_numpy(dtype=bool)
+        )
+
+        # Os bits de dias diferentes não se sobrepõem, então somar equivale a um OR
+        bits = validos.astype(np.uint32) << deslocamento[:, None]
+        bitmaps[i] = np.add.reduceat(bits, inicio_meses, axis=0).T
+        contagens[i] = np.add.reduceat(validos.astype(np.int32), inicio_meses, axis=0).T
+
+    # Somas acumuladas: acumulado[..., m] = dias válidos antes do mês m
+    acumulado = np.zeros((len(estacoes), len(variaveis), len(meses) + 1), dtype=np.int32)
+    np.cumsum(contagens, axis=2, out=acumulado[:, :, 1:])
+
+    print(f"Índice de cobertura construído: {len(estacoes)} estações, {len(variaveis)} variáveis, {len(meses)} meses.")
+
+    return {
+        'estacoes': np.array(estacoes, dtype=str),
+        'variaveis': np.array(variaveis, dtype=str),
+        'meses': meses.to_numpy().astype('datetime64[M]'),
+        'bitmaps': bitmaps,
+        'acumulado': acumulado,
+    }
+
+
+def validades_estacoes_diarias(estacoes):
+    """
+    Converte o dicionário de DataFrames diários no formato esperado por
+    'construir_indice_cobertura' (True onde a observação não é nula).
+    """
+    return {codigo: df.notna() for codigo, df in estacoes.items()}
+
+
+def salvar_indice_cobertura(indice, filepath):
+    """
+    Salva o índice de cobertura em um arquivo .npz ao lado dos dados.
+    """
+    np.savez_compressed(filepath, **indice)
+    print(f"Índice de cobertura salvo em: '{filepath}'")
+
+
+def carregar_indice_cobertura(filepath):
+    """
+    Carrega um índice de cobertura salvo por 'salvar_indice_cobertura'.
+    """
+    try:
+        with np.load(filepath) as dados:
+            indice = {chave: dados[chave] for chave in dados.files}
+        print(f"Índice de cobertura '{filepath}' carregado com sucesso.")
+        return indice
+    except FileNotFoundError:
+        print(f"ERRO: Índice de cobertura '{filepath}' não encontrado.")
+        return None
+
+
+# --- Consultas ---
+
+def _contar_bits(valores):
+    """
+    Conta os bits ligados de cada elemento de um array uint32 (popcount).
+    """
+    v = valores.astype(np.uint32)
+    v = v - ((v >> 1) & np.uint32(0x55555555))
+    v = (v & np.uint32(0x33333333)) + ((v >> 2) & np.uint32(0x33333333))
+    v = (v + (v >> 4)) & np.uint32(0x0F0F0F0F)
+    return ((v * np.uint32(0x01010101)) >> 24).astype(np.int32)
+
+
+def calcular_cobertura(indice, variavel, data_inicio, data_fim):
+    """
+    Retorna uma Series com a fração de dias válidos de cada estação para a
+    variável no intervalo [data_inicio, data_fim] (inclusive).
+
+    Os meses inteiros do intervalo vêm da soma acumulada e os meses das
+    pontas vêm dos bitmaps, então o custo não depende do tamanho do período.
+    """
+    data_inicio = pd.Timestamp(data_inicio).normalize()
+    data_fim = pd.Timestamp(data_fim).normalize()
+    total_dias = (data_fim - data_inicio).days + 1
+
+    estacoes = indice['estacoes']
+    if total_dias <= 0:
+        return pd.Series(np.nan, index=estacoes)
+
+    posicoes = np.flatnonzero(indice['variaveis'] == variavel)
+    if len(posicoes) == 0:
+        raise ValueError(f"Variável '{variavel}' desconhecida. Opções: {', '.join(indice['variaveis'])}")
+    v = int(posicoes[0])
+    meses = indice['meses']
+    bitmaps = indice['bitmaps'][:, v, :]
+    acumulado = indice['acumulado'][:, v, :]
+
+    # Dias fora do período do índice não têm dados: recorta o intervalo
+    primeiro_dia = pd.Timestamp(meses[0])
+    ultimo_dia = pd.Timestamp(meses[-1]) + pd.offsets.MonthEnd(0)
+    inicio = max(data_inicio, primeiro_dia)
+    fim = min(data_fim, ultimo_dia)
+    if inicio > fim:
+        return pd.Series(0.0, index=estacoes)
+
+    m0 = int(np.searchsorted(meses, np.datetime64(inicio, 'M')))
+    m1 = int(np.searchsorted(meses, np.datetime64(fim, 'M')))
+    d0, d1 = inicio.day, fim.day
+
+    # Máscaras de bits das pontas: dias >= d0 no primeiro mês, dias <= d1 no último
+    mascara_inicio = np.uint32((0xFFFFFFFF << (d0 - 1)) & 0xFFFFFFFF)
+    mascara_fim = np.uint32((1 << d1) - 1)
+
+    if m0 == m1:
+        validos = _contar_bits(bitmaps[:, m0] & mascara_inicio & mascara_fim)
+    else:
+        validos = (
+            _contar_bits(bitmaps[:, m0] & mascara_inicio)
+            + (acumulado[:, m1] - acumulado[:, m0 + 1])
+            + _contar_bits(bitmaps[:, m1] & mascara_fim)
+        )
+
+    return pd.Series(validos / total_dias, index=estacoes)
+
+
+def selecionar_estacoes(indice, variavel, data_inicio, data_fim, cobertura_minima=0.8):
+    """
+    Retorna a lista de estações com pelo menos 'cobertura_minima' de dias
+    válidos da variável no intervalo de datas.
+    """
+    cobertura = calcular_cobertura(indice, variavel, data_inicio, data_fim)
+    return cobertura[cobertura >= cobertura_minima].index.tolist()
+
+
+# --- Execução Principal (Ingestão + Índice) ---
+
+if __name__ == "__main__":
+    estacoes = carregar_estacoes_diarias(PASTA_ESTACOES_DIARIAS)
+
+    if estacoes is not None:
+        indice = construir_indice_cobertura(validades_estacoes_diarias(estacoes))
+        salvar_indice_cobertura(indice, os.path.join(PASTA_ESTACOES_DIARIAS, ARQUIVO_INDICE))
+
+        # Exemplo: estações com 90% de precipitação válida no último ano completo
+        selecionadas = selecionar_estacoes(indice, 'Precipitacao', '2024-01-01', '2024-12-31', 0.9)
+        print(f"\n{len(selecionadas)} estações com pelo menos 90% de precipitação válida em 2024.")
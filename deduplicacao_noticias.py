@@ -0,0 +1,155 @@
+import numpy as np
+import re
+import zlib
+import hashlib
+import unicodedata
+
+# --- Detecção de Notícias Quase Duplicadas (MinHash + LSH) ---
+#
+# Cada notícia vira um conjunto de "shingles" (sequências de 3 palavras de
+# titulo + conteudo). A assinatura MinHash resume esse conjunto em
+# NUM_PERMUTACOES inteiros; a fração de posições iguais entre duas
+# assinaturas estima a similaridade de Jaccard entre os textos.
+#
+# A assinatura é dividida em NUM_BANDAS bandas. Cada banda vira uma chave em
+# uma coleção auxiliar do MongoDB (indexada), então achar candidatas é uma
+# consulta por índice, sem comparar com todas as notícias salvas.
+# Com 30 bandas de 4 linhas, a chance de dois textos com Jaccard J
+# colidirem em pelo menos uma banda é 1 - (1 - J^4)^30: cerca de 98% em
+# J = 0.6 e 86% em J = 0.5 (o limiar do LSH fica em ~0.43, bem abaixo do
+# LIMIAR_SIMILARIDADE). Os candidatos extras são descartados na confirmação.
+
+NUM_PERMUTACOES = 120
+NUM_BANDAS = 30
+LINHAS_POR_BANDA = NUM_PERMUTACOES // NUM_BANDAS
+TAMANHO_SHINGLE = 3
+# Similaridade estimada mínima para considerar duas notícias a mesma
+LIMIAR_SIMILARIDADE = 0.6
+
+# Primo maior que 2^32: (a * x + b) cabe em uint64 para a, b, x < 2^32
+_PRIMO = np.uint64(4294967311)
+_rng = np.random.default_rng(20250916) # Semente fixa: as assinaturas salvas precisam continuar comparáveis
+_A = _rng.integers(1, 2**32, size=NUM_PERMUTACOES, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, size=NUM_PERMUTACOES, dtype=np.uint64)
+
+
+def normalizar_texto(texto):
+    """
+    Minúsculas, sem acentos e sem pontuação, para que pequenas variações
+    de escrita entre fontes não mudem os shingles.
+    """
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', texto.lower()).split()
+
+
+def gerar_shingles(titulo, conteudo):
+    """
+    Retorna o conjunto de hashes (32 bits) das sequências de TAMANHO_SHINGLE palavras.
+    """
+    palavras = normalizar_texto(f"{titulo or ''} {conteudo or ''}")
+    if len(palavras) < TAMANHO_SHINGLE:
+        shingles = [' '.join(palavras)]
+    else:
+        shingles = [' '.join(palavras[i:i + TAMANHO_SHINGLE]) for i in range(len(palavras) - TAMANHO_SHINGLE + 1)]
+    return np.array(sorted({zlib.crc32(s.encode('utf-8')) for s in shingles}), dtype=np.uint64)
+
+
+def calcular_minhash(titulo, conteudo):
+    """
+    Assinatura MinHash da notícia: para cada permutação, o menor hash
+    entre os shingles.
+    """
+    shingles = gerar_shingles(titulo, conteudo)
+    # Matriz (permutações x shingles), tudo de uma vez
+    hashes = (_A[:, None] * shingles[None, :] + _B[:, None]) % _PRIMO
+    return hashes.min(axis=1)
+
+
+def chaves_lsh(assinatura):
+    """
+    Divide a assinatura em bandas e gera uma chave curta para cada uma.
+    """
+    bandas = np.asarray(assinatura, dtype=np.uint64).reshape(NUM_BANDAS, LINHAS_POR_BANDA)
+    return [hashlib.blake2b(banda.tobytes(), digest_size=8).hexdigest() for banda in bandas]
+
+
+def similaridade_estimada(assinatura_a, assinatura_b):
+    """
+    Estimativa da similaridade de Jaccard entre duas notícias.
+    """
+    return float(np.mean(np.asarray(assinatura_a, dtype=np.uint64) == np.asarray(assinatura_b, dtype=np.uint64)))
+
+
+# --- Integração com o MongoDB ---
+# As assinaturas são salvas em cada notícia (campo 'minhash') e as chaves das
+# bandas em uma coleção à parte: {banda, chave, noticia_id}.
+
+def criar_indice_lsh(colecao_lsh):
+    colecao_lsh.create_index([("banda", 1), ("chave", 1)])
+
+
+def buscar_duplicata(collection, colecao_lsh, assinatura, chaves):
+    """
+    Procura uma notícia já salva que seja quase duplicada da assinatura.
+    Retorna o documento mais parecido (com _id e grupo_duplicata) ou None.
+    """
+    candidatos = colecao_lsh.find(
+        {"$or": [{"banda": i, "chave": chave} for i, chave in enumerate(chaves)]},
+        {"noticia_id": 1}
+    )
+    ids = list({c["noticia_id"] for c in candidatos})
+    if not ids:
+        return None
+
+    melhor, melhor_similaridade = None, LIMIAR_SIMILARIDADE
+    for doc in collection.find({"_id": {"$in": ids}}, {"minhash": 1, "grupo_duplicata": 1, "titulo": 1}):
+        if "minhash" not in doc: # Bandas registradas, mas a indexação da notícia não terminou
+            continue
+        similaridade = similaridade_estimada(assinatura, doc["minhash"])
+        if similaridade >= melhor_similaridade:
+            melhor, melhor_similaridade = doc, similaridade
+    return melhor
+
+
+def registrar_lsh(colecao_lsh, noticia_id, chaves):
+    colecao_lsh.insert_many([
+        {"banda": i, "chave": chave, "noticia_id": noticia_id} for i, chave in enumerate(chaves)
+    ])
+
+
+def indexar_colecao_existente(collection, colecao_lsh, tamanho_lote=1000):
+    """
+    Calcula as assinaturas das notícias já salvas que ainda não têm 'minhash'
+    ou 'grupo_duplicata' e registra as bandas, agrupando quase duplicadas.
+    Serve para coleções criadas antes da deduplicação e para completar
+    notícias cuja gravação foi interrompida.
+    """
+    criar_indice_lsh(colecao_lsh)
+    processadas = 0
+    cursor = collection.find(
+        {"$or": [{"minhash": {"$exists": False}}, {"grupo_duplicata": {"$exists": False}}]},
+        {"titulo": 1, "conteudo": 1}
+    ).batch_size(tamanho_lote)
+
+    for doc in cursor:
+        assinatura = calcular_minhash(doc.get("titulo"), doc.get("conteudo"))
+        chaves = chaves_lsh(assinatura)
+        duplicata = buscar_duplicata(collection, colecao_lsh, assinatura, chaves)
+
+        # Só a primeira notícia de cada grupo entra no índice LSH. As bandas vão
+        # antes, para a notícia nunca ficar com 'grupo_duplicata' e sem bandas.
+        if duplicata is None:
+            colecao_lsh.delete_many({"noticia_id": doc["_id"]}) # Sobras de uma indexação interrompida
+            registrar_lsh(colecao_lsh, doc["_id"], chaves)
+            grupo = doc["_id"]
+        else:
+            grupo = duplicata.get("grupo_duplicata", duplicata["_id"])
+
+        collection.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"minhash": [int(v) for v in assinatura], "grupo_duplicata": grupo}}
+        )
+        processadas += 1
+
+    print(f"{processadas} notícias existentes indexadas para deduplicação.")
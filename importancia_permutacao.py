@@ -0,0 +1,114 @@
+import pandas as pd
+import numpy as np
+import os
+import hashlib
+from joblib import Parallel, delayed
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.metrics import mean_absolute_error
+from registro_modelos import criar_modelo
+
+# --- Importância por Permutação ---
+#
+# Mede quanto o MAE do backtest piora quando os valores de uma feature são
+# embaralhados nos dados de teste de cada fold. Diferente do
+# feature_importances_ da floresta (por impureza, calculado no treino), vale
+# para qualquer modelo do registro e reflete o desempenho fora da amostra.
+#
+# As repetições rodam em paralelo (joblib). A matriz X é passada aos workers
+# como memmap somente leitura, então todos compartilham o mesmo arquivo em
+# vez de receber uma cópia cada um.
+
+PASTA_CACHE = 'cache_importancia'
+
+
+def _chave_cache(nome_modelo, impressao_dados, n_splits, n_repeticoes, random_state):
+    """
+    Identifica um resultado pelo modelo (nome + hiperparâmetros) e pelos dados.
+    """
+    params = sorted((k, repr(v)) for k, v in criar_modelo(nome_modelo).get_params().items())
+    texto = repr((nome_modelo, params, impressao_dados, n_splits, n_repeticoes, random_state))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def _avaliar_repeticao(model, X, y, idx_teste, erro_base, semente):
+    """
+    Embaralha cada feature (uma de cada vez) nos dados de teste de um fold
+    e retorna o aumento do MAE para cada uma.
+    """
+    rng = np.random.default_rng(semente)
+    # Só a fatia de teste é copiada; X continua compartilhada entre os workers
+    X_teste = X[idx_teste].copy()
+    y_teste = y[idx_teste]
+
+    aumentos = np.empty(X_teste.shape[1])
+    for j in range(X_teste.shape[1]):
+        original = X_teste[:, j].copy()
+        X_teste[:, j] = rng.permutation(original)
+        aumentos[j] = mean_absolute_error(y_teste, model.predict(X_teste)) - erro_base
+        X_teste[:, j] = original
+
+    return aumentos
+
+
+def calcular_importancia_permutacao(nome_modelo, X, y, features_list, impressao_dados,
+                                    n_splits=5, n_repeticoes=10, n_jobs=-1,
+                                    random_state=42, pasta_cache=PASTA_CACHE):
+    """
+    Calcula a importância por permutação nos folds de backtest (janela
+    expansiva). Retorna um DataFrame com a média e o desvio do aumento do
+    MAE (R$) por feature, ordenado da mais para a menos importante.
+
+    'impressao_dados' é a impressão digital devolvida por
+    registro_modelos.preparar_matriz_features; junto com o modelo, forma a
+    chave do cache.
+    """
+    chave = _chave_cache(nome_modelo, impressao_dados, n_splits, n_repeticoes, random_state)
+    cache_path = os.path.join(pasta_cache, f'{chave}.npz')
+
+    if os.path.exists(cache_path):
+        print(f"Importância por permutação reaproveitada do cache '{cache_path}'.")
+        with np.load(cache_path) as cache:
+            importancias = pd.DataFrame({
+                'Importancia_Media': cache['media'],
+                'Importancia_Desvio': cache['desvio'],
+            }, index=cache['features'].tolist())
+        return importancias.sort_values('Importancia_Media', ascending=False)
+
+    print(f"Calculando importância por permutação ({n_splits} folds x {n_repeticoes} repetições)...")
+
+    folds = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    sementes = np.random.SeedSequence(random_state).generate_state(len(folds) * n_repeticoes)
+    resultados = []
+
+    # max_nbytes=0 faz o joblib salvar todos os arrays como memmap compartilhado
+    with Parallel(n_jobs=n_jobs, max_nbytes=0, mmap_mode='r') as paralelo:
+        for f, (idx_treino, idx_teste) in enumerate(folds):
+            model = criar_modelo(nome_modelo)
+            model.fit(X[idx_treino], y[idx_treino])
+            erro_base = mean_absolute_error(y[idx_teste], model.predict(X[idx_teste]))
+
+            # O paralelismo já está nas repetições; evita cada worker abrir mais processos
+            if 'n_jobs' in model.get_params():
+                model.set_params(n_jobs=1)
+
+            resultados.extend(paralelo(
+                delayed(_avaliar_repeticao)(model, X, y, idx_teste, erro_base, sementes[f * n_repeticoes + r])
+                for r in range(n_repeticoes)
+            ))
+
+    aumentos = np.vstack(resultados)
+    importancias = pd.DataFrame({
+        'Importancia_Media': aumentos.mean(axis=0),
+        'Importancia_Desvio': aumentos.std(axis=0),
+    }, index=features_list)
+
+    os.makedirs(pasta_cache, exist_ok=True)
+    np.savez(
+        cache_path,
+        media=importancias['Importancia_Media'].to_numpy(),
+        desvio=importancias['Importancia_Desvio'].to_numpy(),
+        features=np.array(features_list, dtype=str)
+    )
+    print(f"Importância por permutação salva em cache: '{cache_path}'")
+
+    return importancias.sort_values('Importancia_Media', ascending=False)
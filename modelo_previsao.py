@@ -3,8 +3,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
+from registro_modelos import criar_modelo, preparar_matriz_features, comparar_modelos, escolher_modelo
+from importancia_permutacao import calcular_importancia_permutacao
+
+# Modelo padrão de atualizacao_modelo.py e simulacao_cenarios.py (ver registro_modelos.MODELOS).
+# Aqui o treino principal usa o modelo escolhido pelo benchmark.
+NOME_MODELO = 'random_forest'
+# Meta de erro (R$) para escolher o modelo mais barato no benchmark
+MAE_MAXIMO = 5.0
 
 def carregar_dados_mestre(filepath='master_dataframe_mensal.csv'):
     """
@@ -39,18 +46,25 @@ def plotar_previsao_vs_real(y_test, y_pred, data_inicio_teste):
     plt.savefig('grafico_previsao_vs_real.png')
     print("Gráfico de Previsão vs. Real salvo em: 'grafico_previsao_vs_real.png'")
 
-def plotar_importancia_features(model, features_list):
+def plotar_importancia_features(importancias):
     """
-    Plota a importância de cada feature segundo o modelo Random Forest.
+    Plota a importância por permutação de cada feature (aumento do MAE no
+    backtest quando a feature é embaralhada), com o desvio entre repetições.
     """
-    # Cria um DataFrame de importância
-    importances = pd.Series(model.feature_importances_, index=features_list)
-    importances_sorted = importances.sort_values(ascending=False)
+    importances_sorted = importancias.sort_values('Importancia_Media', ascending=False)
     
     plt.figure(figsize=(10, 8))
-    sns.barplot(x=importances_sorted.values, y=importances_sorted.index, palette='viridis')
+    sns.barplot(x=importances_sorted['Importancia_Media'].values, y=importances_sorted.index, palette='viridis')
+    plt.errorbar(
+        x=importances_sorted['Importancia_Media'].values,
+        y=np.arange(len(importances_sorted)),
+        xerr=importances_sorted['Importancia_Desvio'].values,
+        fmt='none',
+        ecolor='black',
+        capsize=3
+    )
     plt.title('Importância das Features para Prever o Preço do Milho', fontsize=16)
-    plt.xlabel('Nível de Importância', fontsize=12)
+    plt.xlabel('Aumento do Erro (MAE, R$) ao Embaralhar a Feature', fontsize=12)
     plt.ylabel('Feature', fontsize=12)
     plt.tight_layout()
     plt.savefig('grafico_importancia_features.png')
@@ -107,25 +121,30 @@ if __name__ == "__main__":
         print(f"Dados de Teste:  {data_inicio_teste} a {data_fim_teste} ({len(X_test)} meses)")
         
         
-        # 4. Treinar o Modelo
-        print("\nTreinando o modelo RandomForestRegressor...")
+        # A mesma matriz de features (em cache) serve ao benchmark e à importância
+        X_bench, y_bench, _, impressao = preparar_matriz_features(df_master, alvo='Preco_R', cache_path='cache_features.npz')
+        
+        
+        # 4. Comparar Modelos e Escolher o do Treino Principal
+        print("\n--- Benchmark dos Modelos (Backtest Cronológico) ---")
+        resultados = comparar_modelos(X_bench, y_bench)
+        print(resultados.round(4).to_string())
+        
+        nome_modelo = escolher_modelo(resultados, MAE_MAXIMO)
+        print(f"\nModelo escolhido pelo benchmark para o treino principal: '{nome_modelo}'")
         
-        # n_estimators = número de "árvores" na floresta
-        # max_depth = profundidade de cada árvore (ajuda a evitar overfitting)
-        # random_state = para resultados reproduzíveis
-        model = RandomForestRegressor(
-            n_estimators=100, 
-            max_depth=10, 
-            random_state=42, 
-            n_jobs=-1, # Usa todos os processadores
-            min_samples_leaf=2 # Exige pelo menos 2 amostras em uma "folha"
-        )
+        
+        # 5. Treinar o Modelo
+        print(f"\nTreinando o modelo '{nome_modelo}'...")
+        
+        # Os hiperparâmetros de cada modelo ficam em registro_modelos.py
+        model = criar_modelo(nome_modelo)
         
         model.fit(X_train, y_train)
         print("Modelo treinado com sucesso!")
         
         
-        # 5. Fazer Previsões e Avaliar
+        # 6. Fazer Previsões e Avaliar
         y_pred = model.predict(X_test)
         
         # Calcular Métricas
@@ -141,14 +160,19 @@ if __name__ == "__main__":
         print(f"Erro Médio (MAE): Em média, as previsões do modelo erraram o preço em R$ {mae:.2f}.")
         
         
-        # 6. Visualizar Resultados
+        # 7. Visualizar Resultados
         print("\nGerando gráficos de resultados...")
         
         # Gráfico 1: Previsão vs. Real
         plotar_previsao_vs_real(y_test, y_pred, data_inicio_teste)
         
-        # Gráfico 2: Importância das Features
-        plotar_importancia_features(model, features_list)
+        # Gráfico 2: Importância das Features (por permutação, nos folds de backtest)
+        importancias = calcular_importancia_permutacao(nome_modelo, X_bench, y_bench, features_list, impressao)
+        plotar_importancia_features(importancias)
+        
+        if nome_modelo != NOME_MODELO:
+            print(f"\nAtenção: atualizacao_modelo.py e simulacao_cenarios.py usam NOME_MODELO = '{NOME_MODELO}'. "
+                  f"Altere para '{nome_modelo}' para usar o modelo escolhido.")
         
         print("\n--- Modelagem Concluída ---")
         print("Próximo passo: Analisar os gráficos e, se estiver satisfeito, construir o Dashboard.")
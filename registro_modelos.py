@@ -0,0 +1,180 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import hashlib
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import RidgeCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+# --- Modelos de Base ---
+
+class SazonalIngenuo(BaseEstimator, RegressorMixin):
+    """
+    Baseline sazonal ingênuo: prevê o valor observado 'periodo' linhas antes.
+    Ignora as features e assume que X começa logo após o fim do treino
+    (como nos folds de backtest). Para horizontes maiores que o período,
+    repete a última temporada conhecida.
+    """
+
+    def __init__(self, periodo=12):
+        self.periodo = periodo
+
+    def fit(self, X, y):
+        y = np.asarray(y, dtype=float)
+        periodo = min(self.periodo, len(y))
+        self.ultima_temporada_ = y[-periodo:]
+        return self
+
+    def predict(self, X):
+        passos = np.arange(len(X)) % len(self.ultima_temporada_)
+        return self.ultima_temporada_[passos]
+
+
+# --- Registro de Modelos ---
+# Todos seguem a interface fit(X, y) / predict(X) do scikit-learn.
+
+def criar_random_forest():
+    # Mesmos hiperparâmetros usados originalmente em modelo_previsao.py
+    return RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        n_jobs=-1, # Usa todos os processadores
+        min_samples_leaf=2 # Exige pelo menos 2 amostras em uma "folha"
+    )
+
+def criar_hist_gradient_boosting():
+    # Agrupa as features em histogramas: treina bem mais rápido que a floresta
+    # quando os dados passarem a ser diários e com muitas estações
+    return HistGradientBoostingRegressor(
+        max_iter=300,
+        learning_rate=0.05,
+        max_leaf_nodes=15,
+        min_samples_leaf=5, # O padrão (20) é grande demais para dados mensais
+        random_state=42
+    )
+
+def criar_linear_regularizado():
+    # Ridge com alpha escolhido por validação interna; padroniza as features antes
+    return make_pipeline(
+        StandardScaler(),
+        RidgeCV(alphas=np.logspace(-3, 3, 13))
+    )
+
+def criar_sazonal_ingenuo():
+    return SazonalIngenuo(periodo=12)
+
+MODELOS = {
+    'random_forest': criar_random_forest,
+    'hist_gradient_boosting': criar_hist_gradient_boosting,
+    'linear_regularizado': criar_linear_regularizado,
+    'sazonal_ingenuo': criar_sazonal_ingenuo,
+}
+
+def criar_modelo(nome):
+    """
+    Cria um modelo novo (não treinado) a partir do nome registrado.
+    """
+    if nome not in MODELOS:
+        raise ValueError(f"Modelo '{nome}' desconhecido. Opções: {', '.join(MODELOS)}")
+    return MODELOS[nome]()
+
+
+# --- Matriz de Features em Cache ---
+
+def preparar_matriz_features(df, alvo='Preco_R', cache_path=None):
+    """
+    Separa X e y do DataFrame mestre como arrays float64 contíguos.
+    Se 'cache_path' for informado, reaproveita a matriz salva enquanto o
+    conteúdo do DataFrame não mudar (comparado por uma impressão digital).
+    Retorna (X, y, lista_de_features, impressao_digital).
+    """
+    # A impressão cobre o alvo, os nomes das colunas e os valores (com o índice)
+    hasher = hashlib.sha1(repr((alvo, df.columns.tolist())).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    impressao = hasher.hexdigest()
+
+    if cache_path is not None and os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            if str(cache['impressao']) == impressao:
+                print(f"Matriz de features reaproveitada do cache '{cache_path}'.")
+                return cache['X'], cache['y'], cache['features'].tolist(), impressao
+
+    features = df.drop(columns=[alvo])
+    X = np.ascontiguousarray(features.to_numpy(dtype=np.float64))
+    y = df[alvo].to_numpy(dtype=np.float64)
+    features_list = features.columns.tolist()
+
+    if cache_path is not None:
+        np.savez(cache_path, X=X, y=y, features=np.array(features_list, dtype=str), impressao=impressao)
+        print(f"Matriz de features salva em cache: '{cache_path}'")
+
+    return X, y, features_list, impressao
+
+
+# --- Benchmark ---
+
+def comparar_modelos(X, y, nomes=None, n_splits=5):
+    """
+    Treina e avalia cada modelo registrado nos mesmos folds cronológicos
+    (janela expansiva). Mede tempo de treino, latência de previsão e erro
+    do backtest. Retorna um DataFrame com uma linha por modelo.
+    """
+    if nomes is None:
+        nomes = list(MODELOS)
+
+    folds = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    resultados = []
+
+    for nome in nomes:
+        tempos_treino, tempos_previsao, erros_abs, erros_quad = [], [], [], []
+        n_previstos = 0
+
+        for idx_treino, idx_teste in folds:
+            modelo = criar_modelo(nome)
+
+            inicio = time.perf_counter()
+            modelo.fit(X[idx_treino], y[idx_treino])
+            tempos_treino.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            y_pred = modelo.predict(X[idx_teste])
+            tempos_previsao.append(time.perf_counter() - inicio)
+
+            erros_abs.append(mean_absolute_error(y[idx_teste], y_pred) * len(idx_teste))
+            erros_quad.append(mean_squared_error(y[idx_teste], y_pred) * len(idx_teste))
+            n_previstos += len(idx_teste)
+
+        # Latência de uma previsão isolada (uma linha), como no uso em produção
+        inicio = time.perf_counter()
+        modelo.predict(X[-1:])
+        latencia_linha = time.perf_counter() - inicio
+
+        resultados.append({
+            'Modelo': nome,
+            'Tempo_Treino_s': np.mean(tempos_treino),
+            'Tempo_Previsao_ms': np.mean(tempos_previsao) * 1000,
+            'Latencia_Linha_ms': latencia_linha * 1000,
+            'MAE_Backtest': np.sum(erros_abs) / n_previstos,
+            'RMSE_Backtest': np.sqrt(np.sum(erros_quad) / n_previstos),
+        })
+
+    return pd.DataFrame(resultados).set_index('Modelo')
+
+
+def escolher_modelo(resultados, mae_maximo):
+    """
+    Escolhe o modelo mais barato (treino + previsão) cujo MAE de backtest
+    fica dentro de 'mae_maximo'. Se nenhum atingir a meta, retorna o de menor MAE.
+    """
+    custo = resultados['Tempo_Treino_s'] + resultados['Tempo_Previsao_ms'] / 1000
+    aprovados = custo[resultados['MAE_Backtest'] <= mae_maximo]
+    if aprovados.empty:
+        print(f"Aviso: nenhum modelo atingiu MAE <= {mae_maximo:.2f}. Usando o de menor erro.")
+        return resultados['MAE_Backtest'].idxmin()
+    return aprovados.idxmin()
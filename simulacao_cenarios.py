@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import itertools
+import fnmatch
+import time
+from registro_modelos import criar_modelo
+from modelo_previsao import carregar_dados_mestre, NOME_MODELO
+
+# --- Simulação de Cenários em Lote ---
+#
+# Um cenário é um vetor de choques, um valor por grupo de features
+# (ex: 'Taxa_Dolar' = +0.10, 'Precipitacao_Sorriso' = -0.30). Os choques são
+# aplicados sobre uma janela base de meses (as últimas linhas do DataFrame
+# mestre) e todos os cenários são montados como um único bloco numpy e
+# avaliados em uma só chamada de predict.
+#
+# Observação: Preco_R_Lag1 é mantido como observado (não há previsão
+# recursiva mês a mês dentro da janela).
+
+# Features que recebem choque aditivo (em vez de percentual), pois podem ser negativas.
+# A regra vale por coluna: qualquer grupo que atinja uma delas (ex: 'Relacao_*') soma o choque.
+FEATURES_ADITIVAS = ('Relacao_Estoque_Uso',)
+
+# Quantidade máxima de linhas (cenários x meses) avaliadas por chamada de predict
+LINHAS_POR_LOTE = 1_000_000
+
+
+def mapear_grupos(grupos, features_list):
+    """
+    Monta a matriz (grupos x features) que indica quais colunas cada grupo
+    afeta. Os grupos aceitam curingas, ex: 'Precipitacao_*'. Se dois grupos
+    atingem a mesma coluna, os choques se compõem (ver montar_matrizes_cenarios).
+    """
+    mapa = np.zeros((len(grupos), len(features_list)), dtype=bool)
+    for i, grupo in enumerate(grupos):
+        colunas = [j for j, col in enumerate(features_list) if fnmatch.fnmatch(col, grupo)]
+        if not colunas:
+            raise ValueError(f"Grupo '{grupo}' não corresponde a nenhuma feature.")
+        mapa[i, colunas] = True
+    return mapa
+
+
+def mapear_aditivas(features_list):
+    """
+    Indica, por coluna, se o choque é aditivo (True) ou percentual (False).
+    """
+    return np.array([
+        any(fnmatch.fnmatch(col, padrao) for padrao in FEATURES_ADITIVAS) for col in features_list
+    ])
+
+
+def gerar_grade(choques):
+    """
+    Gera todas as combinações de choques (produto cartesiano).
+    'choques' = {grupo: lista_de_valores}. Retorna (grupos, matriz N x G).
+    """
+    grupos = list(choques)
+    combinacoes = np.array(list(itertools.product(*choques.values())), dtype=np.float64)
+    return grupos, combinacoes
+
+
+def gerar_monte_carlo(distribuicoes, n_cenarios, random_state=42):
+    """
+    Sorteia 'n_cenarios' choques normais independentes por grupo.
+    'distribuicoes' = {grupo: (media, desvio_padrao)}. Retorna (grupos, matriz N x G).
+    """
+    rng = np.random.default_rng(random_state)
+    grupos = list(distribuicoes)
+    medias = np.array([distribuicoes[g][0] for g in grupos])
+    desvios = np.array([distribuicoes[g][1] for g in grupos])
+    return grupos, rng.normal(medias, desvios, size=(n_cenarios, len(grupos)))
+
+
+def montar_matrizes_cenarios(X_base, mapa, choques, aditivas):
+    """
+    Aplica os choques sobre a janela base e devolve um bloco
+    (n_cenarios * n_meses, n_features), com os meses de cada cenário contíguos.
+
+    Nas colunas percentuais, choques de grupos sobrepostos se multiplicam
+    ((1 - 0.3) * (1 - 0.5) = 0.35); nas colunas aditivas, se somam.
+    """
+    n_cenarios, n_features = len(choques), X_base.shape[1]
+    fator = np.ones((n_cenarios, n_features))
+    deslocamento = np.zeros((n_cenarios, n_features))
+
+    # Um passo por grupo (poucos), cada um vetorizado sobre todos os cenários
+    for g in range(mapa.shape[0]):
+        percentuais = mapa[g] & ~aditivas
+        somadas = mapa[g] & aditivas
+        fator[:, percentuais] *= 1.0 + choques[:, g:g + 1]
+        deslocamento[:, somadas] += choques[:, g:g + 1]
+
+    bloco = X_base[None, :, :] * fator[:, None, :] + deslocamento[:, None, :]
+    return bloco.reshape(-1, X_base.shape[1])
+
+
+def simular_cenarios(model, X_base, features_list, grupos, choques):
+    """
+    Avalia todos os cenários com o modelo treinado.
+    Retorna um array (n_cenarios, n_meses) com o preço previsto de cada mês
+    da janela base em cada cenário.
+    """
+    X_base = np.asarray(X_base, dtype=np.float64)
+    n_meses = X_base.shape[0]
+    mapa = mapear_grupos(grupos, features_list)
+    aditivas = mapear_aditivas(features_list)
+
+    # Em geral cabe tudo em um único lote; lotes só limitam a memória
+    cenarios_por_lote = max(1, LINHAS_POR_LOTE // n_meses)
+    previsoes = np.empty((len(choques), n_meses))
+
+    for inicio in range(0, len(choques), cenarios_por_lote):
+        lote = choques[inicio:inicio + cenarios_por_lote]
+        X_lote = montar_matrizes_cenarios(X_base, mapa, lote, aditivas)
+        previsoes[inicio:inicio + len(lote)] = model.predict(X_lote).reshape(len(lote), n_meses)
+
+    return previsoes
+
+
+def resumir_distribuicao(previsoes, previsao_base):
+    """
+    Resume a distribuição do preço médio da janela entre os cenários,
+    incluindo a variação em relação ao cenário sem choque.
+    """
+    preco_medio = previsoes.mean(axis=1)
+    percentis = np.percentile(preco_medio, [5, 25, 50, 75, 95])
+    return pd.Series({
+        'Cenarios': len(preco_medio),
+        'Preco_Base': previsao_base,
+        'Media': preco_medio.mean(),
+        'Desvio_Padrao': preco_medio.std(),
+        'P5': percentis[0],
+        'P25': percentis[1],
+        'Mediana': percentis[2],
+        'P75': percentis[3],
+        'P95': percentis[4],
+        'Variacao_Media_%': (preco_medio.mean() / previsao_base - 1) * 100,
+    })
+
+
+# --- Execução Principal (Exemplo de Simulação) ---
+
+if __name__ == "__main__":
+    df_master = carregar_dados_mestre('master_dataframe_mensal.csv')
+
+    if df_master is not None:
+        features = df_master.drop(columns=['Preco_R'])
+        features_list = features.columns.tolist()
+
+        # Treina o modelo escolhido com todo o histórico
+        print(f"\nTreinando o modelo '{NOME_MODELO}' com todo o histórico...")
+        model = criar_modelo(NOME_MODELO)
+        model.fit(features.to_numpy(dtype=np.float64), df_master['Preco_R'].to_numpy(dtype=np.float64))
+
+        # Janela base: os últimos 3 meses observados
+        X_base = features.iloc[-3:].to_numpy(dtype=np.float64)
+        previsao_base = model.predict(X_base).mean()
+
+        # Exemplo 1: dólar +10% e chuva em Sorriso 30% abaixo por três meses
+        grupos, choques = gerar_grade({'Taxa_Dolar': [0.10], 'Precipitacao_Sorriso': [-0.30]})
+        previsoes = simular_cenarios(model, X_base, features_list, grupos, choques)
+        print(f"\nDólar +10% e chuva em Sorriso -30% (3 meses): R$ {previsoes.mean():.2f} "
+              f"(base: R$ {previsao_base:.2f})")
+
+        # Exemplo 2: 100 mil cenários de Monte Carlo
+        distribuicoes = {
+            'Taxa_Dolar': (0.0, 0.10),
+            'Precipitacao_*': (0.0, 0.25),
+            'Temperatura_*': (0.0, 0.03),
+            'Relacao_Estoque_Uso': (0.0, 0.05),
+        }
+        grupos, choques = gerar_monte_carlo(distribuicoes, 100_000)
+
+        inicio = time.perf_counter()
+        previsoes = simular_cenarios(model, X_base, features_list, grupos, choques)
+        duracao = time.perf_counter() - inicio
+
+        print(f"\n--- Monte Carlo: {len(choques)} cenários em {duracao:.2f} s ---")
+        print(resumir_distribuicao(previsoes, previsao_base).round(2).to_string())